@@ -1,79 +1,30 @@
 #!/usr/bin/env python3
 import tkinter as tk
 from tkinter import ttk, messagebox
-import ast, math
+import re
+from collections import deque
 
-# ---------- Safe evaluator ----------
-ALLOWED_FUNCS = {
-    "sqrt": math.sqrt, "sin": math.sin, "cos": math.cos, "tan": math.tan,
-    "log": math.log10, "ln": math.log
-}
-ALLOWED_NAMES = {"pi": math.pi, "e": math.e}
+from safe_eval_core import safe_eval, fmt_num
 
-class SafeEval(ast.NodeVisitor):
-    def __init__(self, names):
-        self.names = {**ALLOWED_NAMES, **names}
-
-    def visit_Expression(self, node): return self.visit(node.body)
-    def visit_Constant(self, node):
-        if isinstance(node.value, (int, float)): return node.value
-        raise ValueError("only numbers allowed")
-    def visit_Num(self, node):  # py<3.8
-        return node.n
-    def visit_BinOp(self, node):
-        a, b, op = self.visit(node.left), self.visit(node.right), node.op
-        if   isinstance(op, ast.Add):  return a + b
-        elif isinstance(op, ast.Sub):  return a - b
-        elif isinstance(op, ast.Mult): return a * b
-        elif isinstance(op, ast.Div):  return a / b
-        elif isinstance(op, ast.FloorDiv): return a // b
-        elif isinstance(op, ast.Mod):  return a % b
-        elif isinstance(op, ast.Pow):  return a ** b
-        raise ValueError("operator not allowed")
-    def visit_UnaryOp(self, node):
-        v, op = self.visit(node.operand), node.op
-        if   isinstance(op, ast.UAdd): return +v
-        elif isinstance(op, ast.USub): return -v
-        raise ValueError("unary operator not allowed")
-    def visit_Name(self, node):
-        if node.id in self.names: return self.names[node.id]
-        raise ValueError(f"name '{node.id}' not allowed")
-    def visit_Call(self, node):
-        if not isinstance(node.func, ast.Name): raise ValueError("function not allowed")
-        f = node.func.id
-        if f not in ALLOWED_FUNCS: raise ValueError(f"function '{f}' not allowed")
-        if node.keywords: raise ValueError("no keyword args")
-        args = [self.visit(a) for a in node.args]
-        return ALLOWED_FUNCS[f](*args)
-    def generic_visit(self, node):
-        forbidden = (
-            ast.Assign, ast.Attribute, ast.Subscript, ast.List, ast.Dict, ast.Tuple,
-            ast.Lambda, ast.IfExp, ast.Compare, ast.BoolOp, ast.And, ast.Or,
-            ast.While, ast.For, ast.If, ast.With, ast.Import, ast.ImportFrom,
-            ast.FunctionDef, ast.ClassDef, ast.Module, ast.Expr
-        )
-        if isinstance(node, forbidden): raise ValueError("syntax not allowed")
-        return super().generic_visit(node)
-
-def safe_eval(expr: str, names):
-    # allow % as percent of previous number: 50% -> (50*0.01)
-    expr = percent_to_mul(expr)
-    tree = ast.parse(expr, mode="eval")
-    return SafeEval(names).visit(tree)
+# allow % as percent of previous number: 50% -> (50*0.01)
+_PCT_RE = re.compile(r'(\d+(?:\.\d+)?)%')
 
 def percent_to_mul(s: str):
-    import re
-    return re.sub(r'(\d+(?:\.\d+)?)%', r'(\1*0.01)', s)
-
-def fmt_num(x):
-    try:
-        if float(x).is_integer():
-            return str(int(x))
-    except Exception:
-        pass
-    return f"{float(x):.12g}"
+    return _PCT_RE.sub(r'(\1*0.01)', s)
 
 # ---------- UI ----------
+HISTORY_MAX = 200  # entries kept in memory and in the listbox
+
+# (label, token, row, column, columnspan); rows count from the top of the keypad
+_BUTTON_SPEC = (
+    ("AC","ac",0,0,1), ("DEL","del",0,1,1), ("%","%",0,2,1), ("÷","/",0,3,1),
+    ("7","7",1,0,1),   ("8","8",1,1,1),     ("9","9",1,2,1), ("×","*",1,3,1),
+    ("4","4",2,0,1),   ("5","5",2,1,1),     ("6","6",2,2,1), ("−","-",2,3,1),
+    ("1","1",3,0,1),   ("2","2",3,1,1),     ("3","3",3,2,1), ("+","+",3,3,1),
+    ("(","(",4,0,1),   ("0","0",4,1,1),     (")",")",4,2,1), ("=","=",4,3,1),
+    (".",".",5,0,3),
+)
+
 class CalcApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -94,13 +45,16 @@ class CalcApp(tk.Tk):
 
         self.expr = tk.StringVar(value="")
         self.last_result = 0.0
-        self.history = []  # list of (expr, result)
+        self.history = deque(maxlen=HISTORY_MAX)  # (expr, result), oldest dropped first
 
         self.build_ui()
         self.apply_theme()
         self.bind_events()
 
     def build_ui(self):
+        # ttk widgets are themed through their style, not per widget
+        self.style = ttk.Style(self)
+
         # Theme toggle
         top = ttk.Frame(self)
         top.grid(row=0, column=0, sticky="ew", padx=10, pady=(10,0))
@@ -122,27 +76,12 @@ class CalcApp(tk.Tk):
         self.screen = tk.Entry(left, textvariable=self.expr, justify="right", font=("Segoe UI", 20))
         self.screen.grid(row=1, column=0, columnspan=4, sticky="ew", padx=6, pady=(0,8))
 
-        buttons = [
-            ("AC","ac"), ("DEL","del"), ("%","%"),   ("÷","/"),
-            ("7","7"),  ("8","8"),   ("9","9"),      ("×","*"),
-            ("4","4"),  ("5","5"),   ("6","6"),      ("−","-"),
-            ("1","1"),  ("2","2"),   ("3","3"),      ("+","+"),
-            ("(","("),  ("0","0"),   (")",")"),      ("=","="),
-            (".","."),
-        ]
-
         self.btns = []
-        r = 2; c = 0
-        for label, val in buttons:
+        for label, val, r, c, span in _BUTTON_SPEC:
             btn = tk.Button(left, text=label, command=lambda v=val: self.on_key(v))
+            btn.style_key = "op" if val in ("+", "-", "*", "/") else "eq" if val == "=" else "btn"
+            btn.grid(row=2 + r, column=c, columnspan=span, sticky="ew", padx=4, pady=4)
             self.btns.append(btn)
-            if label == ".":
-                btn.grid(row=r+4, column=0, columnspan=3, sticky="ew", padx=4, pady=4)
-            else:
-                btn.grid(row=r, column=c, sticky="ew", padx=4, pady=4)
-                c += 1
-                if c == 4:
-                    c = 0; r += 1
 
         for col in range(4):
             left.grid_columnconfigure(col, weight=1)
@@ -159,25 +98,17 @@ class CalcApp(tk.Tk):
     def apply_theme(self):
         t = self.themes[self.mode.get()]
         self.configure(bg=t["bg"])
-        for w in self.winfo_children():
-            w.configure(background=t["bg"])
-        # cards and borders
-        for frame in self.winfo_children():
-            for sub in frame.winfo_children():
-                try:
-                    sub.configure(background=t["bg"], foreground=t["fg"])
-                except tk.TclError:
-                    pass
+        # frames, labels and the toggle
+        self.style.configure("TFrame", background=t["bg"])
+        self.style.configure("TLabel", background=t["bg"], foreground=t["fg"])
+        self.style.configure("TCheckbutton", background=t["bg"], foreground=t["fg"])
         # specific widgets
         self.history_line.configure(bg=t["card"], fg=t["muted"], bd=1, relief="solid", highlightthickness=0)
         self.screen.configure(bg=t["card"], fg=t["fg"], bd=1, relief="solid", insertbackground=t["fg"],
                               highlightthickness=0)
         # buttons
         for b in self.btns:
-            txt = b.cget("text")
-            bg = t["btn"]; fg = t["fg"]; bd = t["border"]
-            if txt in ("÷","×","−","+"): bg = t["op"]
-            if txt == "=": bg = t["eq"]
+            bg = t[b.style_key]; fg = t["fg"]
             b.configure(bg=bg, fg=fg, activebackground=bg, activeforeground=fg,
                         relief="raised", bd=1, highlightthickness=0)
         # listbox
@@ -212,14 +143,14 @@ class CalcApp(tk.Tk):
         if token == "=":
             self.equals()
             return
-        # normal append
-        self.expr.set(self.expr.get() + token)
+        # normal append: one Tcl call instead of a get + set round trip
+        self.screen.insert(tk.END, token)
 
     def equals(self):
         s = self.expr.get().strip()
         if not s: return
         try:
-            val = safe_eval(s, names={"ans": self.last_result})
+            val = safe_eval(percent_to_mul(s), names={"ans": self.last_result})
             self.last_result = float(val)
             res = fmt_num(self.last_result)
             self.history_line.config(text=f"{s} =")
@@ -233,6 +164,8 @@ class CalcApp(tk.Tk):
 
     def push_history(self, s, res):
         self.history.append((s, res))
+        if self.hlist.size() >= HISTORY_MAX:
+            self.hlist.delete(tk.END)  # newest is on top, so the oldest is last
         self.hlist.insert(0, f"{s} = {res}")
 
     def use_selected(self):
@@ -0,0 +1,200 @@
+"""
+Safe expression evaluator shared by calc.py and calc_gui.py.
+
+safe_eval(expr, names) evaluates + - * / // % **, parentheses, the funcs in
+ALLOWED_FUNCS and the constants in ALLOWED_NAMES; names supplies extra
+variables such as ans. Anything else raises ValueError.
+"""
+import ast, math, operator, re, keyword
+from functools import lru_cache
+
+# keyed by exact node type: one hash lookup instead of an isinstance chain
+ALLOWED_BINOPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod, ast.Pow: operator.pow
+}
+ALLOWED_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+ALLOWED_FUNCS = {
+    "sqrt": math.sqrt, "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "log": math.log10, "ln": math.log
+}
+ALLOWED_NAMES = {"pi": math.pi, "e": math.e}
+
+# plain decimal literal, as Python itself would accept it (no leading zeros)
+_NUM_RE = re.compile(r"-?(?:(?:0|[1-9][0-9]*)(?:\.[0-9]*)?|\.[0-9]+)")
+
+# functions and constants resolve from this table, built once; no builtins reachable
+_EVAL_GLOBALS = {"__builtins__": {}, **ALLOWED_FUNCS, **ALLOWED_NAMES}
+
+_FORBIDDEN = (
+    ast.Assign, ast.Attribute, ast.Subscript, ast.List, ast.Dict, ast.Tuple,
+    ast.Lambda, ast.IfExp, ast.Compare, ast.BoolOp, ast.And, ast.Or,
+    ast.While, ast.For, ast.If, ast.With, ast.Import, ast.ImportFrom,
+    ast.FunctionDef, ast.ClassDef, ast.Module, ast.Expr
+)
+
+class SafeEval(ast.NodeVisitor):
+    """Reject anything but arithmetic on numbers, allowed names and allowed calls.
+
+    After a visit, ``names`` lists the free names (e.g. ``ans``), in source order,
+    that must be supplied at evaluation time.
+    """
+    # NodeVisitor has no __slots__, so instances keep a __dict__; this still
+    # makes ``names`` a slot rather than a dict entry
+    __slots__ = ("names",)
+
+    def __init__(self):
+        self.names = []
+
+    def visit_Expression(self, node):
+        self.visit(node.body)
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float)):
+            raise ValueError("only numbers allowed")
+
+    # Py<3.8 compatibility (optional)
+    def visit_Num(self, node):  # type: ignore
+        pass
+
+    def visit_BinOp(self, node):
+        if type(node.op) not in ALLOWED_BINOPS:
+            raise ValueError("operator not allowed")
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_UnaryOp(self, node):
+        if type(node.op) not in ALLOWED_UNARY:
+            raise ValueError("unary operator not allowed")
+        self.visit(node.operand)
+
+    def visit_Name(self, node):
+        if node.id not in ALLOWED_NAMES and node.id not in self.names:
+            self.names.append(node.id)
+
+    def visit_Call(self, node, _F=ALLOWED_FUNCS):  # _F: local, not global, lookup
+        if not isinstance(node.func, ast.Name):
+            raise ValueError("function not allowed")
+        fname = node.func.id
+        if fname not in _F:
+            raise ValueError(f"function '{fname}' not allowed")
+        if not (0 < len(node.args) <= 2) or node.keywords:
+            raise ValueError("bad function arity")
+        for a in node.args:
+            self.visit(a)
+
+    # Block anything else
+    def generic_visit(self, node):
+        if isinstance(node, _FORBIDDEN):
+            raise ValueError("syntax not allowed")
+        # the tree goes to compile(), so anything unvetted is refused
+        raise ValueError(f"unsupported syntax: {type(node).__name__}")
+
+@lru_cache(maxsize=256)
+def _parse(expr: str) -> ast.Expression:
+    # Re-submitted expressions (REPL history, repeated "=") skip the parser;
+    # calc.py and calc_gui.py share this and the caches below
+    return ast.parse(expr, mode="eval")
+
+def _fold(node):
+    """Return a copy of a vetted tree with its all-constant subtrees evaluated."""
+    if isinstance(node, ast.Expression):
+        return ast.Expression(body=_fold(node.body))
+    if isinstance(node, ast.BinOp):
+        left, right = _fold(node.left), _fold(node.right)
+        if isinstance(left, ast.Constant) and isinstance(right, ast.Constant):
+            new = ast.Constant(ALLOWED_BINOPS[type(node.op)](left.value, right.value))
+        else:
+            new = ast.BinOp(left, node.op, right)
+    elif isinstance(node, ast.UnaryOp):
+        operand = _fold(node.operand)
+        if isinstance(operand, ast.Constant):
+            new = ast.Constant(ALLOWED_UNARY[type(node.op)](operand.value))
+        else:
+            new = ast.UnaryOp(node.op, operand)
+    elif isinstance(node, ast.Call):
+        args = [_fold(a) for a in node.args]
+        if all(isinstance(a, ast.Constant) for a in args):
+            # every allowed function is pure
+            new = ast.Constant(ALLOWED_FUNCS[node.func.id](*[a.value for a in args]))
+        else:
+            new = ast.Call(node.func, args, [])
+    elif isinstance(node, ast.Name) and node.id in ALLOWED_NAMES:
+        new = ast.Constant(ALLOWED_NAMES[node.id])
+    else:
+        return node
+    return ast.copy_location(new, node)
+
+@lru_cache(maxsize=256)
+def compile_safe(expr: str):
+    """Validate expr and compile it; returns (code object, free names)."""
+    tree = _parse(expr)
+    checker = SafeEval()
+    checker.visit(tree)
+    return compile(_fold(tree), "<calc>", "eval"), tuple(checker.names)
+
+@lru_cache(maxsize=512)
+def _eval_pure(expr: str):
+    # no free names -> the result depends on expr alone
+    code, _ = compile_safe(expr)
+    return eval(code, _EVAL_GLOBALS)
+
+def safe_eval(expr: str, names):
+    if _NUM_RE.fullmatch(expr):
+        # a bare number needs neither the parser nor eval
+        return float(expr) if "." in expr else int(expr)
+    code, free = compile_safe(expr)
+    if not free:
+        return _eval_pure(expr)
+    for k in free:
+        if k not in names:
+            raise ValueError(f"name '{k}' not allowed")
+    return eval(code, _EVAL_GLOBALS, names)  # names shadow the globals, e.g. ans
+
+@lru_cache(maxsize=1)
+def _numba():
+    # optional and slow to import, so only loaded once jit_compile is used
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba
+
+@lru_cache(maxsize=64)
+def jit_compile(expr: str, arg_names=("x",)):
+    """Compile expr into a plain function of arg_names, e.g. for tabulating
+    or plotting ``sin(x)+2*x`` over many points.
+
+    Validation is the same as safe_eval. The function is njit-compiled when
+    numba is installed (first call pays the JIT cost), pure Python otherwise.
+    """
+    for a in arg_names:
+        if not a.isidentifier() or keyword.iskeyword(a):
+            raise ValueError(f"bad argument name '{a}'")
+        if a in ALLOWED_NAMES or a in ALLOWED_FUNCS:
+            raise ValueError(f"argument name '{a}' is reserved")
+    _, free = compile_safe(expr)
+    for k in free:
+        if k not in arg_names:
+            raise ValueError(f"name '{k}' not allowed")
+    # build the lambda as a tree: unparsing the folded tree would lose the
+    # parentheses around negative constants, e.g. (-2)**x -> -2 ** x
+    params = ast.arguments(posonlyargs=[], args=[ast.arg(arg=a) for a in arg_names],
+                           vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[])
+    tree = ast.Expression(body=ast.Lambda(args=params, body=_fold(_parse(expr)).body))
+    f = eval(compile(ast.fix_missing_locations(tree), "<calc>", "eval"), dict(_EVAL_GLOBALS))
+    numba = _numba()
+    # f has no source file, so numba's on-disk cache can't be used;
+    # lru_cache above keeps the compiled dispatcher for the process instead
+    return numba.njit(f) if numba is not None else f
+
+def fmt_num(x):
+    # Keep ~12 sig figs, avoid long floats
+    if not isinstance(x, (int, float)):
+        raise TypeError(f"result is not a real number: {x!r}")
+    if type(x) is int:
+        return str(x)
+    if isinstance(x, float) and math.isfinite(x) and x.is_integer() and abs(x) < 1e16:
+        return str(int(x))
+    return f"{x:.12g}"
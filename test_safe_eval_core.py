@@ -0,0 +1,21 @@
+import unittest
+
+from safe_eval_core import jit_compile, safe_eval
+
+
+class JitCompileTest(unittest.TestCase):
+    def test_matches_safe_eval(self):
+        for expr in ("(-2)**x", "(-1)**x", "(-pi)**x", "-2**x", "sin(x)+2*x*pi"):
+            for v in (2, 3, 0.5):
+                with self.subTest(expr=expr, x=v):
+                    self.assertEqual(jit_compile(expr)(v), safe_eval(expr, {"x": v}))
+
+    def test_reserved_argument_names(self):
+        for name in ("e", "pi", "sqrt"):
+            with self.subTest(name=name):
+                with self.assertRaises(ValueError):
+                    jit_compile("e*2", (name,))
+
+
+if __name__ == "__main__":
+    unittest.main()